@@ -1,9 +1,11 @@
 import os
-import json
+import httpx
+import orjson
 import asyncio
+import threading
 import nest_asyncio
-from groq import Groq
-from typing import List
+from groq import AsyncGroq
+from typing import Tuple
 from dotenv import load_dotenv
 from mcp.client.stdio import stdio_client
 from mcp import ClientSession, StdioServerParameters
@@ -12,21 +14,76 @@ load_dotenv()
 nest_asyncio.apply()
 
 
+async def read_input(prompt):
+    """
+    Read a line from stdin without blocking the event loop.
+
+    input() runs on a daemon thread rather than in the default executor, so a
+    pending read never holds up shutdown (e.g. Ctrl-C at the prompt).
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def read():
+        try:
+            line = input(prompt)
+        except Exception as e:
+            loop.call_soon_threadsafe(resolve, None, e)
+        else:
+            loop.call_soon_threadsafe(resolve, line, None)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
 class PokeBot:
     def __init__(self):
         self.session: ClientSession = None
-        self.llm = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-        self.available_tools: List[dict] = []
+        # keep HTTP/2 connections to the Groq API alive across turns
+        self.llm = AsyncGroq(
+            api_key=os.environ.get("GROQ_API_KEY"),
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=10),
+                timeout=60.0,
+            ),
+        )
+        self.model = os.environ.get("GROQ_LLM")
+        self.available_tools: Tuple[dict, ...] = ()
+        # tool call tracing is opt-in to keep terminal I/O off the hot path
+        self.debug = os.environ.get("POKEBOT_DEBUG", "").lower() in ("1", "true")
+
+    async def call_tool(self, function_name, arguments):
+        # tool invocation through the client session
+        try:
+            result = await self.session.call_tool(function_name, arguments=arguments)
+        except Exception as e:
+            return function_name, f"Error calling tool `{function_name}`: {e}"
+
+        result_content = result.content
+        if isinstance(result_content, list):
+            result_content = "\n".join(str(item.text) for item in result_content)
+
+        return function_name, result_content
 
     async def process_query(self, query):
         messages = [{"role": "user", "content": query}]
+        tools = self.available_tools
         print(f"\n[USER] {query}\n")
 
         # call the llm
-        response = self.llm.chat.completions.create(
-            model=os.environ.get("GROQ_LLM"),
+        response = await self.llm.chat.completions.create(
+            model=self.model,
             messages=messages,
-            tools=self.available_tools,
+            tools=tools,
         )
 
         response_message = response.choices[0].message
@@ -37,25 +94,31 @@ class PokeBot:
             print(f"[ASSISTANT] {response_message.content or '[Tool Calls detected]'}")
             messages.append(response_message)
 
+            tool_args = []
             for tool_call in tool_calls:
-                function_name = tool_call.function.name
                 function_args = tool_call.function.arguments
-                print(f"--> Calling tool `{function_name}` with args: {function_args}")
+                if self.debug:
+                    print(
+                        f"--> Calling tool `{tool_call.function.name}` with args: {function_args}"
+                    )
+                tool_args.append(orjson.loads(function_args))
 
-                # tool invocation through the client session
-                result = await self.session.call_tool(
-                    function_name, arguments=json.loads(function_args)
-                )
+            # run the tool calls concurrently
+            tasks = [
+                asyncio.create_task(self.call_tool(tool_call.function.name, args))
+                for tool_call, args in zip(tool_calls, tool_args)
+            ]
 
-                result_content = result.content
-                if isinstance(result_content, list):
-                    result_content = "\n".join(
-                        str(item.text) for item in result_content
-                    )
+            if self.debug:
+                # report each result as soon as its tool finishes
+                for next_done in asyncio.as_completed(tasks):
+                    function_name, result_content = await next_done
+                    print(f"<-- Result from `{function_name}`: {result_content}\n")
 
-                print(f"<-- Result from `{function_name}`: {result_content}\n")
+            results = await asyncio.gather(*tasks)
 
-                # add the tool response to the conversation
+            # add the tool responses to the conversation, in call order
+            for tool_call, (function_name, result_content) in zip(tool_calls, results):
                 messages.append(
                     {
                         "tool_call_id": tool_call.id,
@@ -66,10 +129,10 @@ class PokeBot:
                 )
 
             # second API call with updated conversation
-            response = self.llm.chat.completions.create(
-                model=os.environ.get("GROQ_LLM"),
+            response = await self.llm.chat.completions.create(
+                model=self.model,
                 messages=messages,
-                tools=self.available_tools,
+                tools=tools,
             )
 
             print(f"[ASSISTANT] {response.choices[0].message.content}\n")
@@ -97,7 +160,8 @@ class PokeBot:
 
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                # read input off the event loop so the MCP session keeps running
+                query = (await read_input("\nQuery: ")).strip()
                 if query.lower() == "quit":
                     break
 
@@ -127,7 +191,7 @@ class PokeBot:
                     [tool.name for tool in tools],
                 )
 
-                self.available_tools = [
+                self.available_tools = tuple(
                     {
                         "type": "function",
                         "function": {
@@ -136,8 +200,8 @@ class PokeBot:
                             "parameters": tool.inputSchema,
                         },
                     }
-                    for tool in response.tools
-                ]
+                    for tool in tools
+                )
 
                 # start chat loop
                 await self.chat_loop()
@@ -145,7 +209,10 @@ class PokeBot:
 
 async def main():
     pokebot = PokeBot()
-    await pokebot.connect_and_run_server()
+    try:
+        await pokebot.connect_and_run_server()
+    finally:
+        await pokebot.llm.close()
 
 
 if __name__ == "__main__":
@@ -1,219 +1,430 @@
-import time
+import os
+import sys
+import asyncio
+import logging
+import functools
+import httpx
+import orjson
 import uvicorn
-import requests
 import argparse
-from typing import Dict
+from typing import Annotated, Dict, Iterable, List, Optional
+from pydantic import AfterValidator, StringConstraints
+from cachetools import TTLCache
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
 from mcp.server.fastmcp import FastMCP
 from fastapi.middleware.cors import CORSMiddleware
 
 
 mcp = FastMCP("pokemon-mcp", stateless_http=True)
 
+# FastMCP sends logs to stderr, keeping stdout free for the stdio transport
+logger = logging.getLogger(__name__)
 
-@mcp.tool()
-def get_pokemon_abilities(
-    pokemon_name: str,
-) -> Dict:
-    """
-    Fetch abilities for a specific Pokémon from the PokéAPI.
+BASE_URL = "https://pokeapi.co/api/v2"
+
+# rate limiting and transient gateway errors are retried with exponential
+# backoff, honouring Retry-After when the server sends one; a longer requested
+# wait than MAX_RETRY_AFTER seconds fails the request instead of stalling the
+# tool call
+RETRY_STATUSES = {429, 502, 503, 504}
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.2
+MAX_RETRY_AFTER = 2.0
+
+# Pokémon name tool argument, validated and normalized by FastMCP before the
+# tool body runs; casefolded to match PokéAPI's lowercase URLs and cache keys
+PokemonName = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, min_length=1),
+    AfterValidator(str.casefold),
+]
+
+# flavor texts use newlines and form feeds as line breaks
+_WHITESPACE_TRANS = str.maketrans({"\n": " ", "\f": " "})
+
+# shared HTTP/2 client, opened in the lifespan so requests are multiplexed
+# over kept-alive connections across tool calls
+http_client: httpx.AsyncClient = None
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        timeout=10.0,
+        headers={"User-Agent": "pokemon-mcp/1.0"},
+    )
+
+
+# caps in-flight PokéAPI requests so large fan-outs stay parallel without
+# flooding the API
+_request_semaphore = asyncio.Semaphore(8)
 
-    Args:
-        pokemon_name (str): The Pokémon name (str).
-    """
-    base_url = "https://pokeapi.co/api/v2"
 
-    if not pokemon_name:
-        raise ValueError("Pokemon identifier cannot be empty")
+# PokéAPI data is effectively immutable, so decoded responses are kept for
+# a day, keyed by URL and shared by every tool
+response_cache: TTLCache = TTLCache(maxsize=4096, ttl=86400)
 
-    if isinstance(pokemon_name, str):
-        pokemon_name = pokemon_name.lower().strip()
-    elif isinstance(pokemon_name, int):
-        if pokemon_name <= 0:
-            raise ValueError("Pokemon ID must be a positive integer")
-    else:
-        raise ValueError("Pokemon identifier must be a string or positive integer")
+# fetches currently on the wire, so concurrent misses for one URL share a
+# single request instead of each going to the network
+_pending_requests: Dict[str, asyncio.Task] = {}
 
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """
+    Return the delay requested by a Retry-After header given in seconds, if any.
+    HTTP-date values and anything else that is not a non-negative number are
+    ignored.
+    """
     try:
-        pokemon_url = f"{base_url}/pokemon/{pokemon_name}"
-        response = requests.get(pokemon_url, timeout=10)
+        delay = float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+    return delay if delay >= 0 else None
+
+
+async def _request_json(url: str) -> Dict:
+    """
+    GET a PokéAPI URL through the shared client and decode the JSON body.
+
+    Rate-limited or transient gateway errors are retried and successful
+    responses are stored in the TTL cache.
+    Returns None when the resource does not exist (HTTP 404).
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        async with _request_semaphore:
+            response = await http_client.get(url)
 
         if response.status_code == 404:
-            raise ValueError(f"Pokémon '{pokemon_name}' not found")
+            return None
 
-        response.raise_for_status()
-        pokemon_data = response.json()
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            break
 
-        # extract basic information
-        result = {
-            "pokemon_name": pokemon_data["name"],
-            "pokemon_id": pokemon_data["id"],
-            "abilities": [],
-        }
+        # Retry-After: 0 retries immediately, no header falls back to backoff
+        delay = _retry_after(response)
+        if delay is None:
+            delay = RETRY_BACKOFF * 2**attempt
+        elif delay > MAX_RETRY_AFTER:
+            response.raise_for_status()
 
-        # process abilities
-        for ability_entry in pokemon_data["abilities"]:
-            ability_info = {
-                "name": ability_entry["ability"]["name"],
-                "is_hidden": ability_entry["is_hidden"],
-                "slot": ability_entry["slot"],
-            }
+        await asyncio.sleep(delay)
 
-            # fetch detailed information
-            try:
-                ability_url = ability_entry["ability"]["url"]
-                ability_response = requests.get(ability_url, timeout=10)
-                ability_response.raise_for_status()
-                ability_detail = ability_response.json()
-
-                # get English description and effect
-                description = "No description available"
-                effect = "No effect description available"
-
-                # find English flavor text (description)
-                for flavor_text in ability_detail.get("flavor_text_entries", []):
-                    if flavor_text["language"]["name"] == "en":
-                        description = (
-                            flavor_text["flavor_text"]
-                            .replace("\n", " ")
-                            .replace("\f", " ")
-                        )
-                        break
-
-                # find English effect entry
-                for effect_entry in ability_detail.get("effect_entries", []):
-                    if effect_entry["language"]["name"] == "en":
-                        effect = effect_entry["effect"]
-                        break
-
-                ability_info.update(
-                    {
-                        "description": description,
-                        "effect": effect,
-                        "generation": ability_detail["generation"]["name"],
-                    }
-                )
-
-                time.sleep(0.1)
-
-            except requests.exceptions.RequestException as e:
-                print(
-                    f"Warning: Could not fetch detailed info for ability '{ability_info['name']}': {e}"
-                )
-
-            result["abilities"].append(ability_info)
-
-        # sort abilities by slot for consistent ordering
-        result["abilities"].sort(key=lambda x: x["slot"])
-
-        return result
-
-    except requests.exceptions.Timeout:
-        raise requests.exceptions.RequestException(
-            "Request timed out. Please try again."
-        )
-    except requests.exceptions.ConnectionError:
-        raise requests.exceptions.RequestException(
-            "Connection error. Please check your internet connection."
-        )
-    except requests.exceptions.RequestException as e:
-        raise requests.exceptions.RequestException(f"API request failed: {e}")
-    except KeyError as e:
-        raise Exception(f"Unexpected API response structure. Missing key: {e}")
-    except Exception as e:
-        raise Exception(f"An unexpected error occurred: {e}")
+    response_cache[url] = data
+    return data
 
 
-@mcp.tool()
-def get_pokemon_stats(pokemon_name: str) -> Dict:
+async def _get_json(url: str) -> Dict:
     """
-    Fetch base stats for a specific Pokémon by name from the PokéAPI.
+    Return the decoded JSON for a PokéAPI URL, served from the TTL cache on
+    repeat calls. Callers that miss while the same URL is already being
+    fetched wait for that request; failures are not cached.
+    Returns None when the resource does not exist (HTTP 404).
+    """
+    if url in response_cache:
+        return response_cache[url]
 
-    Args:
-        pokemon_name (str): The name of the Pokémon.
+    task = _pending_requests.get(url)
+    if task is None:
+        task = asyncio.create_task(_request_json(url))
+        _pending_requests[url] = task
+        task.add_done_callback(lambda _: _pending_requests.pop(url, None))
+
+    # shielded so one cancelled caller does not cancel the fetch for the rest
+    return await asyncio.shield(task)
+
+
+def pokeapi_tool(func):
     """
+    Turn PokéAPI transport errors raised by a tool into readable messages.
 
-    if not isinstance(pokemon_name, str):
-        raise ValueError("Pokemon name must be a string")
+    Everything else propagates unchanged and is reported by FastMCP.
+    """
 
-    if not pokemon_name or not pokemon_name.strip():
-        raise ValueError("Pokemon name cannot be empty")
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except httpx.TimeoutException as e:
+            raise httpx.HTTPError(
+                "Request to PokéAPI timed out. Please try again."
+            ) from e
+        except httpx.ConnectError as e:
+            raise httpx.HTTPError(
+                "Unable to connect to PokéAPI. Please check your internet connection."
+            ) from e
+        except httpx.HTTPError as e:
+            raise httpx.HTTPError(f"PokéAPI request failed: {e}") from e
+
+    return wrapper
+
+
+class PokemonNotFound(ValueError):
+    """
+    Raised when PokéAPI has no Pokémon with the requested name.
+    """
 
-    clean_name = pokemon_name.lower().strip()
 
-    base_url = "https://pokeapi.co/api/v2"
-    pokemon_url = f"{base_url}/pokemon/{clean_name}"
+async def _fetch_pokemon(pokemon_name: str) -> Dict:
+    """
+    Fetch the `/pokemon/{name}` record through the shared cache.
 
-    try:
-        response = requests.get(pokemon_url, timeout=10)
+    Raises PokemonNotFound when the Pokémon does not exist.
+    """
+    pokemon_data = await _get_json(f"{BASE_URL}/pokemon/{pokemon_name}")
 
-        if response.status_code == 404:
-            raise ValueError(
-                f"Pokémon '{pokemon_name}' not found. Please check the spelling and try again."
-            )
+    if pokemon_data is None:
+        raise PokemonNotFound(
+            f"Pokémon '{pokemon_name}' not found. Please check the spelling and try again."
+        )
 
-        # raise exception for other HTTP errors
-        response.raise_for_status()
+    return pokemon_data
 
-        pokemon_data = response.json()
 
-        # extract stats information
-        base_stats = {}
-        stat_details = []
-        total_stats = 0
+async def _fetch_ability_details(ability_urls: Iterable[str]) -> Dict:
+    """
+    Fetch ability detail records concurrently, once per unique URL.
+
+    Returns a mapping of URL to the decoded record, or to the exception raised
+    while fetching it.
+    """
+    unique_urls = list(dict.fromkeys(ability_urls))
+    ability_details = await asyncio.gather(
+        *(_get_json(url) for url in unique_urls),
+        return_exceptions=True,
+    )
+
+    return dict(zip(unique_urls, ability_details))
 
-        for stat_entry in pokemon_data["stats"]:
-            stat_name = stat_entry["stat"]["name"]
-            base_stat_value = stat_entry["base_stat"]
-            effort_value = stat_entry["effort"]
 
-            # add to base_stats dictionary
-            base_stats[stat_name] = base_stat_value
+def _build_abilities(pokemon_data: Dict, ability_details: Dict) -> List[Dict]:
+    """
+    Build the ability list for a Pokémon record from prefetched ability details.
+    """
+    abilities = []
+
+    # process abilities
+    for ability_entry in pokemon_data["abilities"]:
+        ability_detail = ability_details[ability_entry["ability"]["url"]]
+        ability_info = {
+            "name": ability_entry["ability"]["name"],
+            "is_hidden": ability_entry["is_hidden"],
+            "slot": ability_entry["slot"],
+        }
+
+        if isinstance(ability_detail, httpx.HTTPError):
+            logger.warning(
+                "Could not fetch detailed info for ability '%s': %s",
+                ability_info["name"],
+                ability_detail,
+            )
+        elif isinstance(ability_detail, BaseException):
+            raise ability_detail
+        elif ability_detail is not None:
+            # English flavor text (description) and effect entry
+            description = next(
+                (
+                    flavor_text["flavor_text"].translate(_WHITESPACE_TRANS)
+                    for flavor_text in ability_detail.get("flavor_text_entries", [])
+                    if flavor_text["language"]["name"] == "en"
+                ),
+                "No description available",
+            )
+            effect = next(
+                (
+                    effect_entry["effect"]
+                    for effect_entry in ability_detail.get("effect_entries", [])
+                    if effect_entry["language"]["name"] == "en"
+                ),
+                "No effect description available",
+            )
 
-            # add to detailed stats list
-            stat_details.append(
+            ability_info.update(
                 {
-                    "stat_name": stat_name,
-                    "base_stat": base_stat_value,
-                    "effort": effort_value,
+                    "description": description,
+                    "effect": effect,
+                    "generation": ability_detail["generation"]["name"],
                 }
             )
 
-            # calculate total
-            total_stats += base_stat_value
+        abilities.append(ability_info)
 
-        # construct result dictionary
-        result = {
-            "pokemon_name": pokemon_data["name"],
-            "pokemon_id": pokemon_data["id"],
-            "base_stats": base_stats,
-            "total_base_stats": total_stats,
-            "stat_details": stat_details,
-        }
+    # sort abilities by slot for consistent ordering
+    abilities.sort(key=lambda x: x["slot"])
 
-        return result
+    return abilities
 
-    except requests.exceptions.Timeout:
-        raise requests.exceptions.RequestException(
-            "Request timed out while fetching Pokémon data. Please try again."
-        )
-    except requests.exceptions.ConnectionError:
-        raise requests.exceptions.RequestException(
-            "Unable to connect to PokéAPI. Please check your internet connection."
-        )
-    except requests.exceptions.RequestException as e:
-        raise requests.exceptions.RequestException(
-            f"Failed to fetch Pokémon data: {str(e)}"
-        )
-    except KeyError as e:
-        raise Exception(f"Unexpected API response format. Missing expected field: {e}")
-    except Exception as e:
-        raise Exception(
-            f"An unexpected error occurred while processing Pokémon stats: {str(e)}"
+
+async def _collect_abilities(pokemon_data: Dict) -> List[Dict]:
+    """
+    Build the ability list for a Pokémon record, fetching details concurrently.
+    """
+    ability_details = await _fetch_ability_details(
+        ability_entry["ability"]["url"] for ability_entry in pokemon_data["abilities"]
+    )
+
+    return _build_abilities(pokemon_data, ability_details)
+
+
+def _collect_stats(pokemon_data: Dict) -> Dict:
+    """
+    Extract base stats and their total from a Pokémon record.
+    """
+    stats = pokemon_data["stats"]
+    base_stats = {s["stat"]["name"]: s["base_stat"] for s in stats}
+
+    return {
+        "base_stats": base_stats,
+        "total_base_stats": sum(base_stats.values()),
+        # EV yield, keeping only the stats that actually award effort
+        "effort_values": {s["stat"]["name"]: s["effort"] for s in stats if s["effort"]},
+    }
+
+
+@mcp.tool()
+@pokeapi_tool
+async def get_pokemon_abilities(
+    pokemon_name: PokemonName,
+) -> Dict:
+    """
+    Fetch abilities for a specific Pokémon from the PokéAPI.
+
+    Args:
+        pokemon_name (str): The Pokémon name (str).
+    """
+    pokemon_data = await _fetch_pokemon(pokemon_name)
+
+    # extract basic information
+    result = {
+        "pokemon_name": pokemon_data["name"],
+        "pokemon_id": pokemon_data["id"],
+        "abilities": await _collect_abilities(pokemon_data),
+    }
+
+    return result
+
+
+@mcp.tool()
+@pokeapi_tool
+async def get_many_pokemon_abilities(pokemon_names: List[PokemonName]) -> Dict:
+    """
+    Fetch abilities for several Pokémon from the PokéAPI in one call. Prefer
+    this over calling get_pokemon_abilities once per Pokémon. Unknown
+    Pokémon are reported with an `error` entry instead of failing the call.
+
+    Args:
+        pokemon_names (List[str]): The names of the Pokémon.
+    """
+    # repeated names are only fetched once
+    unique_names = list(dict.fromkeys(pokemon_names))
+    pokemon_records = await asyncio.gather(
+        *(_fetch_pokemon(pokemon_name) for pokemon_name in unique_names),
+        return_exceptions=True,
+    )
+
+    # an unknown Pokémon only fails its own entry, anything else fails the call
+    for pokemon_data in pokemon_records:
+        if isinstance(pokemon_data, BaseException) and not isinstance(
+            pokemon_data, PokemonNotFound
+        ):
+            raise pokemon_data
+
+    # abilities shared between the Pokémon are only fetched once
+    ability_details = await _fetch_ability_details(
+        ability_entry["ability"]["url"]
+        for pokemon_data in pokemon_records
+        if not isinstance(pokemon_data, PokemonNotFound)
+        for ability_entry in pokemon_data["abilities"]
+    )
+
+    result = {"pokemon": []}
+    for pokemon_name, pokemon_data in zip(unique_names, pokemon_records):
+        if isinstance(pokemon_data, PokemonNotFound):
+            result["pokemon"].append(
+                {"pokemon_name": pokemon_name, "error": str(pokemon_data)}
+            )
+            continue
+
+        result["pokemon"].append(
+            {
+                "pokemon_name": pokemon_data["name"],
+                "pokemon_id": pokemon_data["id"],
+                "abilities": _build_abilities(pokemon_data, ability_details),
+            }
         )
 
+    return result
+
+
+@mcp.tool()
+@pokeapi_tool
+async def get_pokemon_stats(pokemon_name: PokemonName) -> Dict:
+    """
+    Fetch base stats for a specific Pokémon by name from the PokéAPI.
+
+    Returns `base_stats`, their `total_base_stats` and `effort_values`, the
+    EV yield for each stat that awards effort.
+
+    Args:
+        pokemon_name (str): The name of the Pokémon.
+    """
+    pokemon_data = await _fetch_pokemon(pokemon_name)
+
+    # construct result dictionary
+    result = {
+        "pokemon_name": pokemon_data["name"],
+        "pokemon_id": pokemon_data["id"],
+        **_collect_stats(pokemon_data),
+    }
+
+    return result
+
 
-app = FastAPI(title="pokemon-fastapi", lifespan=lambda app: mcp.session_manager.run())
+@mcp.tool()
+@pokeapi_tool
+async def get_pokemon_summary(pokemon_name: PokemonName) -> Dict:
+    """
+    Fetch abilities and base stats for a specific Pokémon from the PokéAPI
+    in one call. Prefer this over calling the abilities and stats tools
+    separately when both are needed. Stats have the same shape as
+    get_pokemon_stats.
+
+    Args:
+        pokemon_name (str): The name of the Pokémon.
+    """
+    pokemon_data = await _fetch_pokemon(pokemon_name)
+
+    # construct result dictionary
+    result = {
+        "pokemon_name": pokemon_data["name"],
+        "pokemon_id": pokemon_data["id"],
+        "abilities": await _collect_abilities(pokemon_data),
+        **_collect_stats(pokemon_data),
+    }
+
+    return result
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+
+    async with _create_http_client() as client:
+        http_client = client
+        async with mcp.session_manager.run():
+            yield
+
+
+app = FastAPI(
+    title="pokemon-fastapi",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.mount("/server", mcp.streamable_http_app())
 
 # Apply CORS middleware
@@ -229,6 +440,23 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run MCP server with FastAPI")
     parser.add_argument("--host", type=str, default="127.0.0.1", help="Host IP address")
     parser.add_argument("--port", type=int, default=8000, help="Port number")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(2, os.cpu_count() or 1),
+        help="Number of worker processes",
+    )
     args = parser.parse_args()
 
-    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+    # the MCP app is stateless, so requests can be spread across workers;
+    # uvicorn needs an import string rather than the app object to spawn them
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        log_level="info",
+    )